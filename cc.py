@@ -2,9 +2,41 @@ import re
 import sys
 import os
 import csv
+import bisect
+import pickle
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import re2 as _func_regex_engine
+except ImportError:
+    _func_regex_engine = re
 
 control_structures = ['if', 'else if', 'for', 'while', 'do', 'case', 'switch']
 
+# Compiled once at import; these run for every file and every function body
+# String literals, character literals and both comment styles in one left-to-right pass
+_RE_STRIP = re.compile(r'(?P<str>"(?:\\.|[^"\\])*")|(?P<chr>\'(?:\\.|[^\'\\])*\')|//[^\n]*|/\*.*?\*/', re.S)
+_RE_LINE_CMT = re.compile(r'//.*')
+_RE_BLOCK_CMT = re.compile(r'/\*.*?\*/', re.S)
+_RE_NEWLINE = re.compile(r'\n')
+_RE_BRACE = re.compile(r'[{}]')
+# Decision points: branching keywords, ternary operator and logical operators
+_RE_DECISIONS = re.compile(r'\bif\b|\bfor\b|\bwhile\b|\bcase\b|\bcatch\b|\?|&&|\|\|')
+# A heuristic regex to match function headers (C/C++ style). It matches return/type and name and params.
+# The lazy, nested classes can backtrack badly on generated code, so use RE2's linear-time engine
+# when it is installed (pip install google-re2). The pattern has no anchors, so no flags are needed.
+_RE_FUNC = _func_regex_engine.compile(r'([A-Za-z_~][\w:\*<>,\s\&\(\)\[\]]*?)\s+([A-Za-z_~][\w:]*)\s*\([^;{]*\)\s*(?:const\s*)?(?:->\s*[A-Za-z_][\w:]*)?\s*\{')
+
+# Cached records are only valid for the scanner that produced them: bump this whenever
+# the scanning changes. The regex engine is part of the key too (RE2's \w and \s are
+# ASCII-only, re's are Unicode)
+_CACHE_VERSION = 1
+_CACHE_TAG = (_CACHE_VERSION, _func_regex_engine.__name__)
+
+# Forked workers inherit the compiled patterns above; spawn (Windows) re-imports this module instead
+_MP_CONTEXT = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn')
+
 class project:
     def __init__(self, name, description, src, src_file_extensions, ignore=None):
         self.name = name
@@ -12,12 +44,35 @@ class project:
         self.src = src
         self.src_file_extensions = src_file_extensions
         self.ignore = ignore
+        self._ignore_res = [re.compile(p) for p in ignore] if ignore else []
+        self._ext_tuple = tuple(src_file_extensions)
     
-    def get_cc_metrics(self):
+    def _iter_files(self):
+        """Yield matching source files under self.src in os.walk (top-down) order."""
+        stack = [self.src]
+        while stack:
+            subdirs = []
+            try:
+                it = os.scandir(stack.pop())
+            except OSError:
+                continue
+            with it:
+                for e in it:
+                    # DirEntry caches the file type from readdir, so no extra stat per entry
+                    if e.is_dir(follow_symlinks=False):
+                        subdirs.append(e.path)
+                    elif e.name.endswith(self._ext_tuple) and not any(r.match(e.name) for r in self._ignore_res):
+                        yield e.path
+            stack.extend(reversed(subdirs))
+
+    def get_cc_metrics(self, cache=None):
         """
         Traverse self.src and compute cyclomatic complexity per function for files
         matching self.src_file_extensions. Returns a dict with total CC, file
         count and details list of dicts: {filename, function_start, function_end, cc}.
+
+        cache: optional dict mapping path -> ((st_mtime_ns, st_size), records). Files
+        whose stat key still matches are not re-scanned; the dict is updated in place.
         """
         if not os.path.exists(self.src):
             raise FileNotFoundError(self.src)
@@ -26,39 +81,79 @@ class project:
         files_count = 0
         details = []
 
-        def handle_file(path):
-            try:
-                funcs = find_functions_in_file(path)
-            except Exception:
-                return None
-            return funcs
-
         if os.path.isfile(self.src):
-            if any(self.src.endswith(ext) for ext in self.src_file_extensions):
-                recs = handle_file(self.src)
+            if self.src.endswith(self._ext_tuple):
+                recs = _handle_file(self.src)
                 if recs:
                     for r in recs:
                         details.append(r)
                         total_cc += r['cc']
                     files_count += 1
         else:
-            for root, dirs, files in os.walk(self.src):
-                for name in files:
-                    if not any(name.endswith(ext) for ext in self.src_file_extensions):
-                        continue
-                    if self.ignore and any(re.match(pattern, name) for pattern in self.ignore):
-                        continue
-                    path = os.path.join(root, name)
-                    recs = handle_file(path)
-                    if recs:
-                        for r in recs:
-                            details.append(r)
-                            total_cc += r['cc']
-                        files_count += 1
+            if cache is None:
+                cache = {}
+            entries = []
+            for path in self._iter_files():
+                try:
+                    st = os.stat(path)
+                    key = (st.st_mtime_ns, st.st_size)
+                except OSError:
+                    key = None
+                entries.append((path, key))
+            misses = [path for path, key in entries if key is None or cache.get(path, (None,))[0] != key]
+
+            fresh = {}
+            if misses:
+                # files are independent, so scan them in worker processes
+                with ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=_MP_CONTEXT,
+                                         initializer=_warm_regexes) as ex:
+                    fresh = dict(zip(misses, ex.map(_handle_file, misses, chunksize=16)))
+
+            for path, key in entries:
+                if path in fresh:
+                    recs = fresh[path]
+                    if key is not None:
+                        cache[path] = (key, recs)
+                else:
+                    recs = cache[path][1]
+                if recs:
+                    for r in recs:
+                        details.append(r)
+                        total_cc += r['cc']
+                    files_count += 1
 
         return {"total_cc": total_cc, "files_count": files_count, "details": details}
 
 
+def _warm_regexes():
+    # run each pattern once so any lazy matcher state is built before the first task
+    for pattern in (_RE_STRIP, _RE_NEWLINE, _RE_BRACE, _RE_DECISIONS, _RE_FUNC):
+        pattern.search('')
+
+
+def _load_cache(path):
+    # a cache written under a different _CACHE_TAG (or in the old untagged format) is dropped
+    try:
+        with open(path, 'rb') as f:
+            tag, cache = pickle.load(f)
+    except Exception:
+        return {}
+    return cache if tag == _CACHE_TAG else {}
+
+
+def _save_cache(path, cache):
+    with open(path, 'wb') as f:
+        pickle.dump((_CACHE_TAG, cache), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _handle_file(path):
+    # module-level so it can be pickled into worker processes
+    try:
+        return find_functions_in_file(path)
+    except Exception:
+        return None
+
+
 def calculate_edges_and_nodes(file_path):
     # Read file with encoding fallbacks
     try:
@@ -72,8 +167,8 @@ def calculate_edges_and_nodes(file_path):
             return 0, 0
 
     # Remove single-line and multi-line comments
-    code = re.sub(r'//.*', '', code)
-    code = re.sub(r'/\*.*?\*/', '', code, flags=re.S)
+    code = _RE_LINE_CMT.sub('', code)
+    code = _RE_BLOCK_CMT.sub('', code)
 
     # This function is kept for backward compatibility but is no longer used
     # in the per-function calculation. Return zeros to signal unused.
@@ -96,14 +191,46 @@ def _read_file_with_fallback(file_path):
             return None
 
 
+def _strip_replacement(m):
+    kind = m.lastgroup
+    if kind == 'str':
+        return '""'
+    if kind == 'chr':
+        return "''"
+    # keep the line breaks of block comments so line numbers still match the source
+    return '\n' * m.group().count('\n')
+
+
 def _strip_comments_and_strings(code):
-    # remove string literals (naive) and character literals to avoid counting
-    code = re.sub(r'"(\\.|[^"\\])*"', '""', code, flags=re.S)
-    code = re.sub(r"'(\\.|[^'\\])*'", "''", code, flags=re.S)
-    # remove single-line and multi-line comments
-    code = re.sub(r'//.*', '', code)
-    code = re.sub(r'/\*.*?\*/', '', code, flags=re.S)
-    return code
+    # empty string and character literals (naive) to avoid counting their contents,
+    # and drop single-line and multi-line comments. Scanning all four in one pass means
+    # whichever construct opens first wins, e.g. a // inside a string is left alone.
+    return _RE_STRIP.sub(_strip_replacement, code)
+
+
+def _newline_offsets(code):
+    # sorted offsets of every newline; bisect into it to turn an index into a line number
+    return [m.start() for m in _RE_NEWLINE.finditer(code)]
+
+
+def _find_matching_brace(code, start):
+    """Return the index of the brace closing the one at `start`, or -1.
+    Jumps from brace to brace so the characters in between are skipped in C.
+    """
+    balance = 0
+    for b in _RE_BRACE.finditer(code, start):
+        if b.group() == '{':
+            balance += 1
+        else:
+            balance -= 1
+            if balance == 0:
+                return b.start()
+    return -1
+
+
+def _count_decisions(code, start, end):
+    """Count decision points in code[start:end] without materializing the slice."""
+    return len(_RE_DECISIONS.findall(code, start, end))
 
 
 def find_functions_in_file(file_path):
@@ -115,50 +242,22 @@ def find_functions_in_file(file_path):
         return []
 
     code = _strip_comments_and_strings(content)
+    nl_offsets = _newline_offsets(code)
     results = []
 
-    # A heuristic regex to match function headers (C/C++ style). It matches return/type and name and params
-    func_pattern = re.compile(r'([A-Za-z_~][\w:\*<>,\s\&\(\)\[\]]*?)\s+([A-Za-z_~][\w:]*)\s*\([^;{]*\)\s*(?:const\s*)?(?:->\s*[A-Za-z_][\w:]*)?\s*\{', re.M)
-
-    for m in func_pattern.finditer(code):
+    for m in _RE_FUNC.finditer(code):
         open_brace_idx = m.end() - 1
-        # find matching closing brace
-        idx = open_brace_idx
-        length = len(code)
-        balance = 0
-        found = False
-        while idx < length:
-            ch = code[idx]
-            if ch == '{':
-                balance += 1
-            elif ch == '}':
-                balance -= 1
-                if balance == 0:
-                    close_brace_idx = idx
-                    found = True
-                    break
-            idx += 1
-        if not found:
+        close_brace_idx = _find_matching_brace(code, open_brace_idx)
+        if close_brace_idx < 0:
             continue
 
         # Compute line numbers
-        start_line = code[:m.start()].count('\n') + 1
-        end_line = code[:close_brace_idx].count('\n') + 1
-
-        body = code[m.end():close_brace_idx]
-
-        # Count decision points inside the body
-        decisions = 0
-        decisions += len(re.findall(r'\bif\b', body))
-        decisions += len(re.findall(r'\bfor\b', body))
-        decisions += len(re.findall(r'\bwhile\b', body))
-        decisions += len(re.findall(r'\bcase\b', body))
-        decisions += len(re.findall(r'\bcatch\b', body))
-        # ternary operator
-        decisions += body.count('?')
-        # logical operators
-        decisions += body.count('&&')
-        decisions += body.count('||')
+        start_line = bisect.bisect_left(nl_offsets, m.start()) + 1
+        end_line = bisect.bisect_left(nl_offsets, close_brace_idx) + 1
+
+        # Count decision points inside the body in a single scan. pos/endpos bound the
+        # scan to the body without copying it out of `code`
+        decisions = _count_decisions(code, m.end(), close_brace_idx)
 
         cc = decisions + 1
 
@@ -204,15 +303,22 @@ if __name__ == "__main__":
 
     output_dir = "output/cc"
     os.makedirs(output_dir, exist_ok=True)
+    cache_path = os.path.join(output_dir, ".cc_cache.pkl")
+    cache = _load_cache(cache_path)
 
     try:
         for project in projects:
-            with open(f"{output_dir}/{project.name.replace(' ', '_').lower()}_cc.csv", "w") as f:
-                f.write("filename,function_start,function_end,cyclomatic\n")
-                metrics = project.get_cc_metrics()
-                for detail in metrics["details"]:
-                    f.write(f"{detail['filename']},{detail['function_start']},{detail['function_end']},{detail['cc']}\n")
+            with open(f"{output_dir}/{project.name.replace(' ', '_').lower()}_cc.csv", "w", newline="") as f:
+                writer = csv.writer(f, lineterminator="\n")
+                writer.writerow(["filename", "function_start", "function_end", "cyclomatic"])
+                metrics = project.get_cc_metrics(cache)
+                writer.writerows(
+                    (d['filename'], d['function_start'], d['function_end'], d['cc'])
+                    for d in metrics["details"]
+                )
 
     except FileNotFoundError:
         print(f"File not found: {project.src}")
         sys.exit(1)
+    finally:
+        _save_cache(cache_path, cache)
@@ -17,6 +17,8 @@ import glob
 import math
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use("Agg")  # only PDFs are written; skip GUI backend detection
 import matplotlib.pyplot as plt
 
 # ------------------- CONFIG -------------------
@@ -25,29 +27,41 @@ OUT_DIR = "plots/cc"     # where PDFs will be saved
 MIN_CAP = 10              # minimum x-axis cap
 GLOBAL_MAX_CAP = 50       # max allowed x-axis cap (visual)
 TOP_OUTLIER_SHOW = 5      # how many top outlier values to show in annotation
+CACHE_PATH = os.path.join(OUT_DIR, ".cache.npz")  # sorted values/percentiles/caps keyed by CSV mtime
 # ------------------------------------------------
 
+# One figure is reused for every plot: each helper resizes it, clears the axes and redraws
+_FIG, _AX = plt.subplots(figsize=(8, 5))
+
+
+def _reset_axes(width, height):
+    _FIG.set_size_inches(width, height)
+    _AX.clear()
+    return _FIG, _AX
+
 
 def ensure_out(path):
     os.makedirs(path, exist_ok=True)
 
 
 def read_cc_csv(path):
-    df = pd.read_csv(path)
-    df.columns = [c.strip().lower() for c in df.columns]
-    if "cyclomatic" not in df.columns:
+    # only the cyclomatic column is needed, so let the C parser skip the rest
+    df = pd.read_csv(path, usecols=lambda c: c.strip().lower() == "cyclomatic", engine="c")
+    if df.shape[1] == 0:
         raise ValueError(f"'cyclomatic' column not in {path}")
-    return pd.to_numeric(df["cyclomatic"], errors="coerce").dropna().astype(int)
+    col = df.iloc[:, 0]
+    if not pd.api.types.is_integer_dtype(col):
+        col = pd.to_numeric(col, errors="coerce").dropna()
+    # plain ndarray from here on: no pandas indexing overhead in the stats below
+    return col.to_numpy(dtype=np.int32)
 
 
 def choose_cap(series, min_cap=MIN_CAP, global_max=GLOBAL_MAX_CAP):
     """Choose dynamic cap based on percentiles."""
-    if series.empty:
+    if series.size == 0:
         return min_cap, {}
-    p75 = np.percentile(series, 75)
-    p90 = np.percentile(series, 90)
-    p95 = np.percentile(series, 95)
-    p99 = np.percentile(series, 99)
+    # one call partitions the data once for all four percentiles
+    p75, p90, p95, p99 = np.percentile(series, [75, 90, 95, 99])
 
     if p99 <= global_max:
         cap = math.ceil(p99)
@@ -62,21 +76,61 @@ def choose_cap(series, min_cap=MIN_CAP, global_max=GLOBAL_MAX_CAP):
     return cap, {"p75": p75, "p90": p90, "p95": p95, "p99": p99}
 
 
+PCT_KEYS = ("p75", "p90", "p95", "p99")
+
+
+def load_stats_cache(path):
+    """Return the cached per-CSV arrays, or {} if there is no usable cache."""
+    try:
+        with np.load(path) as data:
+            return {k: data[k] for k in data.files}
+    except Exception:
+        # missing, or truncated/corrupt (e.g. BadZipFile, EOFError): just rebuild it
+        return {}
+
+
+def save_stats_cache(path, cache):
+    """Write the cache to a temporary file and move it into place, so an interrupted
+    run never leaves a truncated cache behind."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, **cache)
+    os.replace(tmp, path)
+
+
+def cached_stats(cache, key, path):
+    """Return (sorted values, cap, percentiles) for a CSV, reusing the cache while the
+    file's mtime and the cap settings are unchanged. Stores fresh entries in `cache`."""
+    stamp = np.array([os.stat(path).st_mtime_ns, MIN_CAP, GLOBAL_MAX_CAP], dtype=np.int64)
+    if f"{key}__stamp" in cache and np.array_equal(cache[f"{key}__stamp"], stamp):
+        pct = dict(zip(PCT_KEYS, cache[f"{key}__pct"]))
+        return cache[f"{key}__sorted"], int(cache[f"{key}__cap"]), pct
+
+    values = np.sort(read_cc_csv(path))
+    cap, pct = choose_cap(values)
+    cache[f"{key}__stamp"] = stamp
+    cache[f"{key}__sorted"] = values
+    cache[f"{key}__cap"] = np.array(cap)
+    cache[f"{key}__pct"] = np.array([pct[k] for k in PCT_KEYS] if pct else [], dtype=np.float64)
+    return values, cap, pct
+
+
 def plot_histogram_with_outliers(series, project_label, outpath, cap):
     """Histogram capped at chosen limit, with outlier annotation."""
-    fig, ax = plt.subplots(figsize=(8, 4.5))
+    fig, ax = _reset_axes(8, 4.5)
 
-    outliers = series[series > cap].sort_values(ascending=False)
+    outliers = np.sort(series[series > cap])[::-1]
     clipped = series[series <= cap]
 
     bins = np.arange(0, cap + 2) - 0.5
-    counts, edges, patches = ax.hist(clipped, bins=bins, edgecolor='black', linewidth=0.4)
+    counts, edges = np.histogram(clipped, bins=bins)
+    ax.bar((edges[:-1] + edges[1:]) / 2, counts, width=1.0, edgecolor='black', linewidth=0.4)
 
     n_outliers = int(outliers.size)
     if n_outliers > 0:
         # small red bar to indicate number of outliers (drawn to the right of cap)
         ax.bar(cap + 0.6, n_outliers, width=0.3, color='tab:red', alpha=0.7)
-        top_vals = outliers.unique()[:TOP_OUTLIER_SHOW]
+        top_vals = np.unique(outliers)[::-1][:TOP_OUTLIER_SHOW]
         info_text = f"Outliers (>{cap}): {n_outliers}\nTop: {', '.join(map(str, top_vals))}"
         ax.text(0.98, 0.95, info_text, transform=ax.transAxes,
                 ha="right", va="top",
@@ -92,14 +146,13 @@ def plot_histogram_with_outliers(series, project_label, outpath, cap):
     ax.set_xlim(-0.6, cap + 1)
 
     ax.grid(axis="y", linestyle=":", alpha=0.6)
-    plt.tight_layout()
+    fig.subplots_adjust(left=0.1, right=0.98, top=0.92, bottom=0.12)
     fig.savefig(outpath)
-    plt.close(fig)
 
 
 def plot_bar(values, labels, ylabel, title, outpath, annotate=False):
     """General bar plot function, with optional numeric annotations."""
-    fig, ax = plt.subplots(figsize=(8, 5))
+    fig, ax = _reset_axes(8, 5)
     x = np.arange(len(labels))
     bars = ax.bar(x, values, color="C0")
 
@@ -129,20 +182,22 @@ def plot_bar(values, labels, ylabel, title, outpath, annotate=False):
                 ha="center", va="bottom", fontsize=9
             )
 
-    plt.tight_layout()
+    fig.subplots_adjust(left=0.1, right=0.98, top=0.88, bottom=0.15)
     fig.savefig(outpath)
-    plt.close(fig)
 
 
 def plot_high_cc_counts(dict_cc, thresholds, outpath):
+    """dict_cc values must be sorted (as cached_stats returns them)."""
     projects = list(dict_cc.keys())
-    counts = {t: [(dict_cc[p] > t).sum() for p in projects] for t in thresholds}
+    # the values are sorted, so the count above any threshold is a binary search
+    counts = {t: [len(dict_cc[p]) - np.searchsorted(dict_cc[p], t, side="right") for p in projects]
+              for t in thresholds}
 
     x = np.arange(len(projects))
     width = 0.2
     offsets = np.linspace(-width, width, len(thresholds))
 
-    fig, ax = plt.subplots(figsize=(10, 5))
+    fig, ax = _reset_axes(10, 5)
 
     for i, t in enumerate(thresholds):
         bar_positions = x + offsets[i]
@@ -168,9 +223,8 @@ def plot_high_cc_counts(dict_cc, thresholds, outpath):
     ax.legend()
     ax.grid(axis="y", linestyle=":", alpha=0.6)
 
-    plt.tight_layout()
+    fig.subplots_adjust(left=0.08, right=0.98, top=0.88, bottom=0.15)
     fig.savefig(outpath)
-    plt.close(fig)
 
 
 # ------------------- MAIN -------------------
@@ -183,15 +237,24 @@ if not csv_paths:
 dict_cc = {}
 labels = []
 caps_report = {}
+cache = load_stats_cache(CACHE_PATH)
+fresh_cache = {}
 
 for path in csv_paths:
     name = os.path.splitext(os.path.basename(path))[0]
     label = name.replace("_cc", "").replace("_", " ").strip()
-    dict_cc[label] = read_cc_csv(path)
+    for suffix in ("stamp", "sorted", "cap", "pct"):
+        if f"{name}__{suffix}" in cache:
+            fresh_cache[f"{name}__{suffix}"] = cache[f"{name}__{suffix}"]
+    dict_cc[label], cap, pct = cached_stats(fresh_cache, name, path)
+    caps_report[label] = {"cap": cap, "percentiles": pct}
     labels.append(label)
 
+# only entries for CSVs that still exist are written back
+save_stats_cache(CACHE_PATH, fresh_cache)
+
 # 1 — Average CC (annotated)
-avg_vals = [dict_cc[p].mean() for p in labels]
+avg_vals = [dict_cc[p].mean() if dict_cc[p].size else 0.0 for p in labels]
 plot_bar(
     avg_vals, labels,
     "Average CC",
@@ -201,7 +264,7 @@ plot_bar(
 )
 
 # 2 — Max CC (annotated)
-max_vals = [dict_cc[p].max() for p in labels]
+max_vals = [dict_cc[p].max() if dict_cc[p].size else 0 for p in labels]
 plot_bar(
     max_vals, labels,
     "Max CC",
@@ -212,8 +275,7 @@ plot_bar(
 
 # 3 — Per-project histograms with dynamic caps and outlier annotation
 for project, series in dict_cc.items():
-    cap, pct = choose_cap(series)
-    caps_report[project] = {"cap": cap, "percentiles": pct}
+    cap = caps_report[project]["cap"]
     outpath = os.path.join(OUT_DIR, f"cc_histogram_{project.replace(' ', '_')}.pdf")
     plot_histogram_with_outliers(series, project, outpath, cap=cap)
 
@@ -1,5 +1,56 @@
 import sys
 import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+# Line comments run to the end of the line; block comments may span lines. String and
+# character literals are matched too, so whichever construct opens first wins and a
+# "/*" or "//" inside a literal is left alone. Kept identical to sloc.py.
+_COMMENT_RE = re.compile(
+    rb'(?P<lit>"(?:\\(?:\r\n|.)|[^"\\\r\n])*"|\'(?:\\(?:\r\n|.)|[^\'\\\r\n])*\')'
+    rb'|//[^\r\n]*|/\*.*?\*/', re.S)
+_RE_NON_BREAK = re.compile(rb'[^\r\n]+')
+
+
+# module-level so they can be pickled into worker processes
+def _count_loc(path):
+    cnt = 0
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for _ in f:
+                cnt += 1
+    except (UnicodeDecodeError, PermissionError):
+        # fallback to latin-1 for files with different encoding, skip unreadable files
+        try:
+            with open(path, 'r', encoding='latin-1') as f:
+                for _ in f:
+                    cnt += 1
+        except Exception:
+            return 0
+    except IsADirectoryError:
+        return 0
+    return cnt
+
+
+def _keep_line_breaks(m):
+    if m.lastgroup == 'lit':
+        return m.group()
+    return _RE_NON_BREAK.sub(b'', m.group())
+
+
+def _count_sloc(path):
+    # Same rule as sloc.py, so loc.csv and the KLOC fed to COCOMO agree: a line counts
+    # if anything is left on it once comments are removed
+    try:
+        with open(path, 'rb') as f:
+            code = f.read()
+    except (PermissionError, IsADirectoryError):
+        return 0
+    # the comment markers are ASCII so no decoding is needed, and bytes.splitlines()
+    # breaks on \n, \r and \r\n like text-mode universal newlines
+    code = _COMMENT_RE.sub(_keep_line_breaks, code)
+    return sum(1 for line in code.splitlines() if line.strip())
+
 
 class project:
     def __init__(self, name, description, src, src_file_extensions):
@@ -7,100 +58,47 @@ class project:
         self.description = description
         self.src = src
         self.src_file_extensions = src_file_extensions
+        self._ext_tuple = tuple(src_file_extensions)
+        self._sloc = None
 
     def get_LOC(self):
-        def count_file(path):
-            cnt = 0
-            try:
-                with open(path, 'r', encoding='utf-8') as f:
-                    for _ in f:
-                        cnt += 1
-            except (UnicodeDecodeError, PermissionError):
-                # fallback to latin-1 for files with different encoding, skip unreadable files
-                try:
-                    with open(path, 'r', encoding='latin-1') as f:
-                        for _ in f:
-                            cnt += 1
-                except Exception:
-                    return 0
-            except IsADirectoryError:
-                return 0
-            return cnt
-        
-        if not os.path.exists(self.src):
-            raise FileNotFoundError(self.src)
-
-        total = 0
-        if os.path.isfile(self.src):
-            return count_file(self.src)
-
-        for root, dirs, files in os.walk(self.src):
-            for name in files:
-                if not any(name.endswith(ext) for ext in self.src_file_extensions):
-                    continue
-                path = os.path.join(root, name)
-                total += count_file(path)
-
-        return total
+        return self._sum_over_files(_count_loc)
 
     def get_SLOC(self):
-        # Source Lines of Code (SLOC) counting can be implemented here
-        def count_file(path):
-            cnt = 0
-            file_content = ""
+        # Source Lines of Code (SLOC), counted once per instance: get_cocomo_metrics
+        # asks for it once per mode, and each count is a full tree scan in a fresh pool
+        if self._sloc is None:
+            self._sloc = self._sum_over_files(_count_sloc)
+        return self._sloc
+
+    def _iter_files(self):
+        """Yield matching source files under self.src in os.walk (top-down) order."""
+        stack = [self.src]
+        while stack:
+            subdirs = []
             try:
-                with open(path, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        file_content += line
-            except (UnicodeDecodeError, PermissionError):
-                # fallback to latin-1 for files with different encoding, skip unreadable files
-                try:
-                    with open(path, 'r', encoding='latin-1') as f:
-                        for line in f:
-                            file_content += line
-                except Exception:
-                    return 0
-            except IsADirectoryError:
-                return 0
-            file_content.replace('\r\n', '\n').replace('\r', '\n')
-            lines = file_content.split('\n')
-            in_multiline_comment = False
-            for line in lines:
-                stripped_line = line.strip()
-                if in_multiline_comment:
-                    if '*/' in stripped_line:
-                        in_multiline_comment = False
-                        stripped_line = stripped_line.split('*/', 1)[1].strip()
-                    else:
-                        continue
-                if not stripped_line or stripped_line.startswith('//'):
-                    continue
-                if '/*' in stripped_line:
-                    in_multiline_comment = True
-                    stripped_line = stripped_line.split('/*', 1)[0].strip()
-                    if not stripped_line:
-                        continue
-                cnt += 1
-            return cnt
-
-
-
-        
+                it = os.scandir(stack.pop())
+            except OSError:
+                continue
+            with it:
+                for e in it:
+                    # DirEntry caches the file type from readdir, so no extra stat per entry
+                    if e.is_dir(follow_symlinks=False):
+                        subdirs.append(e.path)
+                    elif e.name.endswith(self._ext_tuple):
+                        yield e.path
+            stack.extend(reversed(subdirs))
+
+    def _sum_over_files(self, count_file):
         if not os.path.exists(self.src):
             raise FileNotFoundError(self.src)
 
-        total = 0
         if os.path.isfile(self.src):
             return count_file(self.src)
 
-        for root, dirs, files in os.walk(self.src):
-            for name in files:
-                if not any(name.endswith(ext) for ext in self.src_file_extensions):
-                    continue
-                path = os.path.join(root, name)
-                total += count_file(path)
-
-        return total
+        # files are independent, so count them in worker processes
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+            return sum(ex.map(count_file, self._iter_files(), chunksize=16))
 
     def get_cocomo_metrics(self, mode="organic"):
         """
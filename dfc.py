@@ -1,21 +1,32 @@
 import os
 import re
+import csv
+import pickle
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Optional, Tuple
 import lizard
+import numpy as np
 
+# Cached results are only valid for the analysis that produced them: bump this whenever
+# the DFC estimate or the per-function details change. The lizard version is part of the
+# key too, since its parser decides the functions and their complexity
+CACHE_VERSION = 1
+CACHE_TAG = (CACHE_VERSION, getattr(lizard, "version", None))
 
-def estimate_dfc_from_function(func_info) -> int:
-    # Base DFC: parameters represent incoming data dependencies
-    param_flow = func_info.parameter_count
-    
+
+def estimate_dfc(param_flow, complexity):
+    """DFC estimate from parameter counts and cyclomatic complexity; scalars or numpy arrays."""
     # Control flow creates more data flow paths
     # Each decision point can create data dependencies
-    control_flow = max(0, func_info.cyclomatic_complexity - 1)
+    control_flow = np.maximum(0, complexity - 1)
     
     # Estimate: parameters flow through control paths
-    dfc = (param_flow * control_flow) + control_flow
-    
-    return dfc
+    return (param_flow * control_flow) + control_flow
+
+
+def estimate_dfc_from_function(func_info) -> int:
+    # Base DFC: parameters represent incoming data dependencies
+    return int(estimate_dfc(func_info.parameter_count, func_info.cyclomatic_complexity))
 
 
 def analyze_file(file_path: str) -> Tuple[int, int, List[Dict]]:
@@ -27,34 +38,57 @@ def analyze_file(file_path: str) -> Tuple[int, int, List[Dict]]:
     """
     try:
         analysis = lizard.analyze_file(file_path)
+        funcs = analysis.function_list
         
-        total_dfc = 0
-        func_count = 0
-        function_details = []
+        # one vectorised estimate for the whole file instead of a call per function
+        params = np.fromiter((f.parameter_count for f in funcs), dtype=np.int64, count=len(funcs))
+        complexity = np.fromiter((f.cyclomatic_complexity for f in funcs), dtype=np.int64, count=len(funcs))
+        dfcs = estimate_dfc(params, complexity)
         
-        for func in analysis.function_list:
-            dfc = estimate_dfc_from_function(func)
-            total_dfc += dfc
-            func_count += 1
-            
-            function_details.append({
-                'file': file_path,
-                'function': func.name,
-                'parameters': func.parameter_count,
-                'complexity': func.cyclomatic_complexity,
-                'dfc': dfc,
-                'nloc': func.nloc
-            })
+        function_details = [{
+            'file': file_path,
+            'function': func.name,
+            'parameters': func.parameter_count,
+            'complexity': func.cyclomatic_complexity,
+            'dfc': dfc,
+            'nloc': func.nloc
+        } for func, dfc in zip(funcs, dfcs.tolist())]
         
-        return total_dfc, func_count, function_details
+        return int(dfcs.sum()), len(funcs), function_details
     except Exception:
         return 0, 0, []
 
 
-def analyze_directory(directory: str, extensions: List[str], ignore: Optional[List[str]] = None) -> Tuple[Dict[str, int], List[Dict]]:
+def _walk_files(directory: str):
+    """Yield (path, name) for every file under directory, in os.walk (top-down) order."""
+    stack = [directory]
+    while stack:
+        subdirs = []
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                # DirEntry carries the type from readdir, so no stat per entry
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                else:
+                    yield entry.path, entry.name
+        stack.extend(reversed(subdirs))
+
+
+def analyze_directory(directory: str, extensions: List[str], ignore: Optional[List[str]] = None,
+                      cache: Optional[Dict] = None) -> Tuple[Dict[str, int], List[Dict]]:
     """
     Aggregate DFC across all source files in a directory matching extensions.
     
+    extensions and ignore may already be a tuple and compiled patterns; both are
+    then used as-is.
+    
+    cache: optional dict mapping path -> ((st_mtime_ns, st_size), analyze_file result).
+    Unchanged files are not re-parsed; the dict is updated in place.
+    
     Returns (metrics_dict, function_details_list).
     """
     if not os.path.exists(directory):
@@ -65,18 +99,47 @@ def analyze_directory(directory: str, extensions: List[str], ignore: Optional[Li
     total_functions = 0
     all_function_details = []
     
-    for root, _, files in os.walk(directory):
-        for name in files:
-            if not any(name.endswith(ext) for ext in extensions):
-                continue
-            if ignore and any(re.match(pat, name) for pat in ignore):
-                continue
-            path = os.path.join(root, name)
-            dfc, funcs, func_details = analyze_file(path)
-            total_dfc += dfc
-            total_functions += funcs
-            total_files += 1
-            all_function_details.extend(func_details)
+    ext_tuple = tuple(extensions)
+    ignore_res = [re.compile(pat) for pat in (ignore or [])]
+    paths = []
+    for path, name in _walk_files(directory):
+        if not name.endswith(ext_tuple):
+            continue
+        if any(r.match(name) for r in ignore_res):
+            continue
+        paths.append(path)
+    
+    if cache is None:
+        cache = {}
+    keys = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+            keys[path] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            keys[path] = None
+    misses = [path for path in paths if keys[path] is None or cache.get(path, (None,))[0] != keys[path]]
+    
+    # Files are independent and lizard parsing is CPU-bound, so spread them over processes;
+    # a handful of files is not worth the pool start-up
+    if len(misses) <= 4:
+        fresh = dict(zip(misses, map(analyze_file, misses)))
+    else:
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+            fresh = dict(zip(misses, ex.map(analyze_file, misses, chunksize=16)))
+    
+    for path in paths:
+        if path in fresh:
+            result = fresh[path]
+            if keys[path] is not None:
+                cache[path] = (keys[path], result)
+        else:
+            result = cache[path][1]
+        dfc, funcs, func_details = result
+        total_dfc += dfc
+        total_functions += funcs
+        total_files += 1
+        all_function_details.extend(func_details)
     
     metrics = {"dfc": total_dfc, "files": total_files, "functions": total_functions}
     return metrics, all_function_details
@@ -91,44 +154,67 @@ class Project:
         self.src = src
         self.src_file_extensions = src_file_extensions
         self.ignore = ignore
+        # fixed for the life of the project, so build the filters once
+        self._ext_tuple = tuple(src_file_extensions)
+        self._ignore_res = [re.compile(pat) for pat in (ignore or [])]
     
-    def get_dfc_metrics(self) -> Tuple[Dict[str, int], List[Dict]]:
+    def get_dfc_metrics(self, cache: Optional[Dict] = None) -> Tuple[Dict[str, int], List[Dict]]:
         """Return aggregated DFC metrics and function details for the project source path."""
         if os.path.isfile(self.src):
             dfc, funcs, func_details = analyze_file(self.src)
             return {"dfc": dfc, "files": 1, "functions": funcs}, func_details
         else:
-            return analyze_directory(self.src, self.src_file_extensions, self.ignore)
+            return analyze_directory(self.src, self._ext_tuple, self._ignore_res, cache)
+
+
+def load_cache(path: str) -> Dict:
+    """Load a cache written by save_cache, or return an empty one (also when it was
+    written under a different CACHE_TAG)."""
+    try:
+        with open(path, "rb") as f:
+            tag, cache = pickle.load(f)
+    except Exception:
+        return {}
+    return cache if tag == CACHE_TAG else {}
+
+
+def save_cache(path: str, cache: Dict):
+    with open(path, "wb") as f:
+        pickle.dump((CACHE_TAG, cache), f, protocol=pickle.HIGHEST_PROTOCOL)
 
 
 def write_function_details_csv(output_path: str, function_details: List[Dict]):
     """Write function-level DFC details to CSV."""
-    import csv
     if not function_details:
         return
     
     fieldnames = ["file", "function", "parameters", "dfc", "nloc"]
     with open(output_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        for func in function_details:
-            writer.writerow({
-                "file": func.get("file", ""),
-                "function": func.get("function", ""),
-                "parameters": func.get("parameters", 0),
-                "dfc": func.get("dfc", 0),
-                "nloc": func.get("nloc", 0)
-            })
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        writer.writerows(
+            (func.get("file", ""), func.get("function", ""), func.get("parameters", 0),
+             func.get("dfc", 0), func.get("nloc", 0))
+            for func in function_details
+        )
+
+SUMMARY_FIELDS = ["dfc", "files", "functions"]
+
 
 def write_summary_csv(output_path: str, metrics: Dict[str, int]):
     """Write aggregated summary to CSV."""
-    import csv
-    fieldnames = ["dfc", "files", "functions"]
     with open(output_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        row = {k: metrics.get(k, 0) for k in fieldnames}
-        writer.writerow(row)
+        writer = csv.writer(f)
+        writer.writerow(SUMMARY_FIELDS)
+        writer.writerow([metrics.get(k, 0) for k in SUMMARY_FIELDS])
+
+
+def write_all_summaries_csv(output_path: str, all_metrics: List[Tuple[str, Dict[str, int]]]):
+    """Write one summary row per project to a single CSV."""
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["project"] + SUMMARY_FIELDS)
+        writer.writerows([name] + [metrics.get(k, 0) for k in SUMMARY_FIELDS] for name, metrics in all_metrics)
 
 
 if __name__ == "__main__":
@@ -163,10 +249,13 @@ if __name__ == "__main__":
     
     output_dir = "output/dfc"
     os.makedirs(output_dir, exist_ok=True)
+    cache_path = os.path.join(output_dir, ".dfc_cache.pkl")
+    cache = load_cache(cache_path)
+    all_metrics = []
     
     for proj in projects:
         try:
-            metrics, func_details = proj.get_dfc_metrics()
+            metrics, func_details = proj.get_dfc_metrics(cache)
             
             # Write function-level details
             details_file = os.path.join(output_dir, f"{proj.name.replace(' ', '_').lower()}_functions.csv")
@@ -175,6 +264,7 @@ if __name__ == "__main__":
             # Write summary
             summary_file = os.path.join(output_dir, f"{proj.name.replace(' ', '_').lower()}_summary.csv")
             write_summary_csv(summary_file, metrics)
+            all_metrics.append((proj.name, metrics))
             
             # Print aggregated results to console
             print(f"{proj.name}: DFC={metrics['dfc']}, Files={metrics['files']}, Functions={metrics['functions']}")
@@ -182,10 +272,11 @@ if __name__ == "__main__":
         except FileNotFoundError:
             out_file = os.path.join(output_dir, f"{proj.name.replace(' ', '_').lower()}_summary.csv")
             with open(out_file, "w", newline="", encoding="utf-8") as f:
-                import csv
                 writer = csv.writer(f)
                 writer.writerow(["error"])
                 writer.writerow([f"path not found: {proj.src}"])
             print(f"{proj.name}: Path not found")
     
+    save_cache(cache_path, cache)
+    write_all_summaries_csv(os.path.join(output_dir, "all_dfc.csv"), all_metrics)
     print(f"\nWrote DFC metrics to: {output_dir}")
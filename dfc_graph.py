@@ -11,6 +11,7 @@ DFC Plot & Table Generator (Hardcoded Paths Version, improved x-tick handling)
 import os
 import glob
 import math
+import argparse
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -29,13 +30,16 @@ def ensure_outdir(path):
 
 
 def read_functions_csv(path):
-    df = pd.read_csv(path)
-    df.columns = [c.strip().lower() for c in df.columns]
     needed = {"file", "function", "dfc", "nloc"}
+    # only the four columns used below are parsed; the rest are skipped by the C parser
+    df = pd.read_csv(path, usecols=lambda c: c.strip().lower() in needed, engine="c")
+    df.columns = [c.strip().lower() for c in df.columns]
     if not needed.issubset(df.columns):
         raise ValueError(f"{path} missing required columns {needed}")
-    df["dfc"] = pd.to_numeric(df["dfc"], errors="coerce").fillna(0).astype(int)
-    df["nloc"] = pd.to_numeric(df["nloc"], errors="coerce").fillna(0).astype(int)
+    for col in ("dfc", "nloc"):
+        # dfc.py writes plain integers, so the coercion pass is only needed for foreign CSVs
+        if not pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(int)
     return df
 
 
@@ -95,8 +99,11 @@ def plot_histogram_project(df, project, outpath):
     bins = np.arange(0, cap + bin_step, bin_step) - (bin_step / 2.0)
 
     fig, ax = plt.subplots(figsize=(8, 4.5))
+    # Bin on the numpy side and draw the counts as plain bars
     # Use default color palette (no explicit color) — matplotlib will use default blue
-    ax.hist(s[s <= cap], bins=bins, edgecolor="black", linewidth=0.4)
+    counts, edges = np.histogram(s[s <= cap].to_numpy(), bins=bins)
+    centers = 0.5 * (edges[:-1] + edges[1:])
+    ax.bar(centers, counts, width=bin_step, edgecolor="black", linewidth=0.4)
 
     ax.set_title(f"DFC Distribution — {project} (cap = {cap})")
     ax.set_xlabel("DFC")
@@ -205,20 +212,42 @@ def plot_scatter_combined(dict_funcs, outpath):
     plt.close(fig)
 
 
-def make_top10_table(all_funcs_df, out_csv, out_tex, out_pdf):
+def latex_table(df, caption, label):
+    """
+    Render df as a booktabs LaTeX table (same layout as DataFrame.to_latex),
+    without going through pandas' Styler and its Jinja2 templates.
+    """
+    col_format = "".join("r" if pd.api.types.is_numeric_dtype(df[c]) else "l" for c in df.columns)
+    lines = [
+        "\\begin{table}",
+        f"\\caption{{{caption}}}",
+        f"\\label{{{label}}}",
+        f"\\begin{{tabular}}{{{col_format}}}",
+        "\\toprule",
+        " & ".join(map(str, df.columns)) + " \\\\",
+        "\\midrule",
+    ]
+    lines += [" & ".join(map(str, row)) + " \\\\" for row in df.itertuples(index=False)]
+    lines += ["\\bottomrule", "\\end{tabular}", "\\end{table}", ""]
+    return "\n".join(lines)
+
+
+def make_top10_table(all_funcs_df, out_csv, out_tex, out_pdf=None):
     top10 = all_funcs_df.sort_values("dfc", ascending=False).head(10)
     top10 = top10[["project", "file", "function", "dfc", "nloc"]]
 
     top10.to_csv(out_csv, index=False)
 
     # LaTeX table
-    latex = top10.to_latex(index=False,
-                           caption="Top 10 functions by Data-Flow Complexity",
-                           label="tab:top10_dfc")
+    latex = latex_table(top10,
+                        caption="Top 10 functions by Data-Flow Complexity",
+                        label="tab:top10_dfc")
     with open(out_tex, "w") as f:
         f.write(latex)
 
-    # PDF version of table
+    # PDF version of table (slowest artifact: one text object per cell), only on request
+    if out_pdf is None:
+        return
     fig, ax = plt.subplots(figsize=(10, 4))
     ax.axis("off")
     table = ax.table(cellText=top10.values,
@@ -233,6 +262,11 @@ def make_top10_table(all_funcs_df, out_csv, out_tex, out_pdf):
 
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pdf-table", action="store_true",
+                        help="Also render the top-10 table as a PDF")
+    args = parser.parse_args()
+
     ensure_outdir(OUT_DIR)
 
     # load all *_functions.csv
@@ -292,7 +326,7 @@ def main():
         all_funcs_df,
         os.path.join(OUT_DIR, "top10_outliers.csv"),
         os.path.join(OUT_DIR, "top10_outliers.tex"),
-        os.path.join(OUT_DIR, "top10_outliers.pdf")
+        os.path.join(OUT_DIR, "top10_outliers.pdf") if args.pdf_table else None
     )
 
     print(f"All plots & tables saved in: {OUT_DIR}")
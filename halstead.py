@@ -3,7 +3,11 @@ import sys
 import os
 import csv
 import math
-from typing import List, Tuple, Dict, Optional
+import pickle
+import hashlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Tuple, Dict, Optional, Union
 
 # Common C / C++ operators and symbols (regex patterns)
 OPERATORS = [
@@ -19,6 +23,33 @@ OPERATORS = [
 IDENTIFIER = re.compile(r"\b[_a-zA-Z][_a-zA-Z0-9]*\b")
 NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
 
+# All of the above as one alternation, so a file is tokenized in a single left-to-right scan.
+# Operators keep the longest-pattern-first order used before; the lookaheads make
+# "<<=" / ">>=" split as "<", "<=" and "<==" / "!==" as "<", "==", exactly as the old
+# remove-one-operator-at-a-time loop did. Since "." is always taken as an operator,
+# numbers never have a fraction.
+_TOKEN_RE = re.compile(
+    "(?P<op><(?=<=)|>(?=>=)|[<>!](?===)|" + "|".join(sorted(OPERATORS, key=len, reverse=True)) + ")"
+    "|(?P<opr>" + IDENTIFIER.pattern + r"|\b\d+\b)"
+)
+
+# The same scan over raw file bytes, so files never need a full UTF-8 decode. Every token
+# these match is ASCII, so only the distinct tokens are decoded afterwards.
+_STRIP_RES_B = [
+    re.compile(rb"//.*"),
+    re.compile(rb"/\*[\s\S]*?\*/"),
+    re.compile(rb'"(?:\\.|[^"\\])*"'),
+    re.compile(rb"'(?:\\.|[^'\\])*'"),
+]
+_TOKEN_RE_B = re.compile(_TOKEN_RE.pattern.encode())
+
+# Files above this size (typically generated code) are skipped with a warning
+MAX_BYTES = 32 * 1024 * 1024
+
+# Stored with the token-count cache; bump it whenever tokenization changes so stale
+# counts are discarded instead of reused (2: files are tokenized as bytes)
+CACHE_VERSION = 2
+
 
 def strip_comments_and_strings(code: str) -> str:
     """Remove comments and string/char literals from source code."""
@@ -39,31 +70,55 @@ def tokenize_source(code: str) -> Tuple[List[str], List[str]]:
 
     code = strip_comments_and_strings(code)
 
-    # Match operators. Sort by length (regex order) to prefer multi-char operators first.
-    for op in sorted(OPERATORS, key=len, reverse=True):
-        matches = re.findall(op, code)
-        if matches:
-            operators_found.extend(matches)
-            code = re.sub(op, " ", code)
+    # One scan yields (operator, operand) pairs with exactly one side non-empty
+    for op, opr in _TOKEN_RE.findall(code):
+        if op:
+            operators_found.append(op)
+        else:
+            operands_found.append(opr)
+
+    return operators_found, operands_found
 
-    # Match operands: identifiers and numbers
-    operands_found.extend(IDENTIFIER.findall(code))
-    # NUMBER.findall returns tuples if groups exist; use finditer to get group(0)
-    for m in NUMBER.finditer(code):
-        operands_found.append(m.group(0))
+
+def tokenize_source_counts(code: Union[str, bytes]) -> Tuple[Counter, Counter]:
+    """Like tokenize_source, but return occurrence counts of each operator and operand.
+
+    code may be the raw bytes of a file; the counts are keyed by str either way.
+    """
+    operators_found: Counter = Counter()
+    operands_found: Counter = Counter()
+
+    if isinstance(code, bytes):
+        for pattern in _STRIP_RES_B:
+            code = pattern.sub(b"", code)
+        pairs = Counter(_TOKEN_RE_B.findall(code))
+        pairs = Counter({(op.decode("ascii"), opr.decode("ascii")): n for (op, opr), n in pairs.items()})
+    else:
+        pairs = Counter(_TOKEN_RE.findall(strip_comments_and_strings(code)))
+
+    # counting the (operator, operand) pairs is a single C-level pass over the matches
+    for (op, opr), n in pairs.items():
+        if op:
+            operators_found[op] = n
+        else:
+            operands_found[opr] = n
 
     return operators_found, operands_found
 
 
-def compute_halstead(operators: List[str], operands: List[str]) -> Dict[str, float]:
-    """Compute Halstead metrics from lists of operators and operands.
+def compute_halstead(operators: Union[List[str], Counter], operands: Union[List[str], Counter]) -> Dict[str, float]:
+    """Compute Halstead metrics from operators and operands, given as token lists or Counters.
 
     Returns a dictionary with n1, n2, N1, N2, vocabulary, length, volume, difficulty, effort, time, bugs.
     """
-    n1 = len(set(operators))
-    n2 = len(set(operands))
-    N1 = len(operators)
-    N2 = len(operands)
+    if isinstance(operators, Counter):
+        n1, N1 = len(operators), sum(operators.values())
+    else:
+        n1, N1 = len(set(operators)), len(operators)
+    if isinstance(operands, Counter):
+        n2, N2 = len(operands), sum(operands.values())
+    else:
+        n2, N2 = len(set(operands)), len(operands)
 
     vocabulary = n1 + n2
     length = N1 + N2
@@ -97,39 +152,106 @@ def compute_halstead(operators: List[str], operands: List[str]) -> Dict[str, flo
 
 def analyze_file(path: str) -> Dict[str, float]:
     """Analyze a single C/C++ source file and return its Halstead metrics."""
-    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+    with open(path, "rb") as f:
         code = f.read()
-    ops, oprs = tokenize_source(code)
+    ops, oprs = tokenize_source_counts(code)
     return compute_halstead(ops, oprs)
 
 
-def analyze_directory(directory: str, extensions: List[str], ignore: Optional[List[str]] = None) -> Dict[str, float]:
+def _tokenize_file(path: str) -> Optional[Tuple[Counter, Counter]]:
+    """Operator and operand counts of one file, or None if it can't be read (pool worker)."""
+    try:
+        with open(path, "rb") as f:
+            code = f.read()
+        return tokenize_source_counts(code)
+    except Exception:
+        return None
+
+
+def _iter_sources(directory: str, ext_tuple: Tuple[str, ...], ignore_res: List) -> Iterator[str]:
+    """Yield matching source files under directory, in os.walk (top-down) order."""
+    stack = [directory]
+    while stack:
+        subdirs = []
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for e in it:
+                # DirEntry caches the file type from readdir, so no extra stat per entry
+                if e.is_dir(follow_symlinks=False):
+                    subdirs.append(e.path)
+                elif e.name.endswith(ext_tuple) and not any(r.match(e.name) for r in ignore_res):
+                    yield e.path
+        stack.extend(reversed(subdirs))
+
+
+def _content_digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+def analyze_directory(directory: str, extensions: List[str], ignore: Optional[List[str]] = None,
+                      cache: Optional[Dict[str, Tuple[Counter, Counter]]] = None,
+                      used: Optional[Dict[str, Tuple[Counter, Counter]]] = None) -> Dict[str, float]:
     """Walk a directory and aggregate Halstead metrics across files with given extensions.
 
-    ignore: optional list of regex patterns to skip file names.
+    ignore: optional list of regex patterns to skip file names; precompiled patterns
+    (and an extensions tuple) are used as-is.
+    cache: optional dict mapping a content digest -> (operator counts, operand counts).
+    Files whose content was seen before (in this or an earlier run) are not tokenized
+    again; the dict is updated in place.
+    used: optional dict that receives the cache entries of the files seen by this call,
+    so a caller can save only those and let entries for old file versions drop out.
     """
-    all_ops: List[str] = []
-    all_oprs: List[str] = []
+    # counts, not token lists: memory stays proportional to the vocabulary, not the code size
+    all_ops: Counter = Counter()
+    all_oprs: Counter = Counter()
 
     if not os.path.exists(directory):
         raise FileNotFoundError(directory)
 
-    for root, _, files in os.walk(directory):
-        for name in files:
-            if not any(name.endswith(ext) for ext in extensions):
-                continue
-            if ignore and any(re.match(pat, name) for pat in ignore):
-                continue
-            path = os.path.join(root, name)
-            try:
-                with open(path, "r", encoding="utf-8", errors="ignore") as f:
-                    code = f.read()
-                ops, oprs = tokenize_source(code)
-                all_ops.extend(ops)
-                all_oprs.extend(oprs)
-            except Exception:
-                # Skip files we can't read for any reason
-                continue
+    ext_tuple = tuple(extensions)
+    ignore_res = [re.compile(pat) for pat in (ignore or [])]
+
+    if cache is None:
+        cache = {}
+    digests: List[Optional[str]] = []
+    misses: Dict[str, str] = {}  # digest -> one path with that content
+    for path in _iter_sources(directory, ext_tuple, ignore_res):
+        try:
+            if os.path.getsize(path) > MAX_BYTES:
+                print(f"warning: skipping {path} (larger than {MAX_BYTES} bytes)", file=sys.stderr)
+                digest = None
+            else:
+                digest = _content_digest(path)
+        except OSError:
+            digest = None
+        digests.append(digest)
+        if digest is not None and digest not in cache:
+            misses.setdefault(digest, path)
+
+    # Files tokenize independently, so spread them over processes (a handful isn't worth a pool)
+    if len(misses) <= 4:
+        results = map(_tokenize_file, misses.values())
+    else:
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+            results = list(ex.map(_tokenize_file, misses.values(), chunksize=8))
+    for digest, result in zip(misses, results):
+        if result is not None:
+            cache[digest] = result
+
+    for digest in digests:
+        result = cache.get(digest)
+        if result is None:
+            # Skip files we can't read for any reason
+            continue
+        if used is not None:
+            used[digest] = result
+        ops, oprs = result
+        all_ops.update(ops)
+        all_oprs.update(oprs)
 
     return compute_halstead(all_ops, all_oprs)
 
@@ -143,37 +265,67 @@ class Project:
         self.src = src
         self.src_file_extensions = src_file_extensions
         self.ignore = ignore
+        # fixed for the life of the project, so build the filters once
+        self._ext_tuple = tuple(src_file_extensions)
+        self._ignore_res = [re.compile(pat) for pat in (ignore or [])]
 
-    def get_halstead_metrics(self) -> Dict[str, float]:
+    def get_halstead_metrics(self, cache: Optional[Dict] = None, used: Optional[Dict] = None) -> Dict[str, float]:
         """Return aggregated Halstead metrics for the project source path."""
         if os.path.isfile(self.src):
             # Single file
             return analyze_file(self.src)
         else:
-            return analyze_directory(self.src, self.src_file_extensions, self.ignore)
+            return analyze_directory(self.src, self._ext_tuple, self._ignore_res, cache, used)
+
+
+FIELDNAMES = ["n1", "n2", "N1", "N2", "vocabulary", "length", "volume", "difficulty", "effort", "time", "bugs"]
 
 
 def write_metrics_csv(output_path: str, metrics: Dict[str, float]):
-    fieldnames = ["n1", "n2", "N1", "N2", "vocabulary", "length", "volume", "difficulty", "effort", "time", "bugs"]
     with open(output_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
+        writer = csv.writer(f)
+        writer.writerow(FIELDNAMES)
         # Ensure all keys exist (fill 0 if missing)
-        row = {k: metrics.get(k, 0) for k in fieldnames}
-        writer.writerow(row)
+        writer.writerow([metrics.get(k, 0) for k in FIELDNAMES])
+
+
+def write_all_metrics_csv(output_path: str, results: Dict[str, Dict[str, float]]):
+    """Write one row per successfully analyzed project (the input of halstead_graph.py)."""
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["project"] + FIELDNAMES)
+        writer.writerows([name] + [metrics.get(k, 0) for k in FIELDNAMES]
+                         for name, metrics in results.items() if "error" not in metrics)
 
 
-def halstead_matrix_for_projects(projects: List[Project]) -> Dict[str, Dict[str, float]]:
+def halstead_matrix_for_projects(projects: List[Project], cache: Optional[Dict] = None,
+                                 used: Optional[Dict] = None) -> Dict[str, Dict[str, float]]:
     """Compute Halstead metrics for a list of projects and return a mapping name -> metrics."""
     results: Dict[str, Dict[str, float]] = {}
     for proj in projects:
         try:
-            results[proj.name] = proj.get_halstead_metrics()
+            results[proj.name] = proj.get_halstead_metrics(cache, used)
         except FileNotFoundError:
             results[proj.name] = {"error": f"path not found: {proj.src}"}
     return results
 
 
+def load_cache(path: str) -> Dict:
+    """Load a token-count cache written by save_cache, or return an empty one
+    (also when it was written for a different CACHE_VERSION)."""
+    try:
+        with open(path, "rb") as f:
+            version, cache = pickle.load(f)
+    except Exception:
+        return {}
+    return cache if version == CACHE_VERSION else {}
+
+
+def save_cache(path: str, cache: Dict):
+    with open(path, "wb") as f:
+        pickle.dump((CACHE_VERSION, cache), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
 if __name__ == "__main__":
     # Define projects to analyze
     projects = [
@@ -208,7 +360,12 @@ if __name__ == "__main__":
     output_dir = "output/halstead"
     os.makedirs(output_dir, exist_ok=True)
 
-    results = halstead_matrix_for_projects(projects)
+    cache_path = os.path.join(output_dir, ".halstead_cache.pkl")
+    cache = load_cache(cache_path)
+    fresh_cache: Dict = {}
+    results = halstead_matrix_for_projects(projects, cache, fresh_cache)
+    # only entries for file contents seen in this run are written back
+    save_cache(cache_path, fresh_cache)
     for proj in projects:
         metrics = results.get(proj.name, {})
         out_file = os.path.join(output_dir, f"{proj.name.replace(' ', '_').lower()}_halstead.csv")
@@ -220,5 +377,6 @@ if __name__ == "__main__":
                 writer = csv.writer(f)
                 writer.writerow(["error"])
                 writer.writerow([metrics.get("error")])
+    write_all_metrics_csv(os.path.join(output_dir, "halstead_all.csv"), results)
 
     print(f"Wrote halstead metrics to: {output_dir}")
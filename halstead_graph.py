@@ -14,8 +14,8 @@ Behavior:
 """
 
 import os
+import csv
 import math
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 
@@ -75,19 +75,34 @@ def ensure_out(path):
     os.makedirs(path, exist_ok=True)
 
 def load_data(input_dir):
+    """Return (columns, rows); each row is a list of cells aligned with columns."""
     csv_path = os.path.join(input_dir, "halstead_all.csv")
     if os.path.exists(csv_path):
-        df = pd.read_csv(csv_path)
-        # normalize columns
-        df.columns = [c.strip().lower() for c in df.columns]
+        # a handful of rows: the csv module is plenty, no need for a DataFrame
+        with open(csv_path, newline="") as f:
+            reader = csv.reader(f)
+            # normalize columns
+            columns = [c.strip().lower() for c in next(reader, [])]
+            rows = list(reader)
         required = {"project","vocabulary","volume","difficulty","effort","bugs"}
-        if not required.issubset(set(df.columns)):
+        if not required.issubset(set(columns)):
             raise ValueError(f"{csv_path} must contain columns: {required}")
-        return df
+        return columns, rows
     else:
-        # fallback -> build dataframe
-        df = pd.DataFrame(FALLBACK)
-        return df
+        # fallback -> embedded rows
+        columns = list(dict.fromkeys(k for row in FALLBACK for k in row))
+        return columns, [[row.get(c, "") for c in columns] for row in FALLBACK]
+
+def numeric_column(columns, rows, col):
+    """Column as a float array; missing or unparsable values become NaN."""
+    i = columns.index(col)
+    values = []
+    for row in rows:
+        try:
+            values.append(float(row[i]))
+        except (IndexError, ValueError):
+            values.append(np.nan)
+    return np.array(values, dtype=float)
 
 def fmt_sci(x):
     # format large numbers in scientific notation with 2 significant digits
@@ -97,11 +112,11 @@ def fmt_sci(x):
     mant = x / (10**exp)
     return f"{mant:.2f}\\times10^{ {exp} }".replace("^{ ", "^{").replace(" }", "}")
 
-def plot_effort_vs_difficulty(df, outpath):
+def plot_effort_vs_difficulty(data, outpath):
     fig, ax = plt.subplots(figsize=(8,6))
-    x = df["difficulty"].astype(float)
-    y = df["effort"].astype(float)
-    projects = df["project"].astype(str)
+    x = data["difficulty"]
+    y = data["effort"]
+    projects = data["project"]
 
     ax.scatter(x, y, s=80, alpha=0.85, edgecolor="k", linewidth=0.6)
     for xi, yi, p in zip(x, y, projects):
@@ -120,11 +135,11 @@ def plot_effort_vs_difficulty(df, outpath):
     fig.savefig(outpath)
     plt.close(fig)
 
-def plot_difficulty_vs_volume_quadrant(df, outpath):
+def plot_difficulty_vs_volume_quadrant(data, outpath):
     fig, ax = plt.subplots(figsize=(8,6))
-    x = df["difficulty"].astype(float)
-    y = df["volume"].astype(float)
-    projects = df["project"].astype(str)
+    x = data["difficulty"]
+    y = data["volume"]
+    projects = data["project"]
 
     ax.scatter(x, y, s=80, alpha=0.85, edgecolor="k", linewidth=0.6)
     for xi, yi, p in zip(x, y, projects):
@@ -149,27 +164,23 @@ def plot_difficulty_vs_volume_quadrant(df, outpath):
     fig.savefig(outpath)
     plt.close(fig)
 
-def plot_effort_per_function(df, outpath):
+def plot_effort_per_function(data, outpath):
     fig, ax = plt.subplots(figsize=(8,5))
     # need functions column; if missing, try to read from user-provided mapping or set to NaN
-    if "functions" in df.columns:
-        funcs = df["functions"].astype(float)
-    else:
-        # attempt to get functions from an external summary CSV in same folder
-        funcs = None
+    funcs = data.get("functions")
 
-    labels = df["project"].astype(str)
-    efforts = df["effort"].astype(float)
+    labels = data["project"]
+    efforts = data["effort"]
 
-    if funcs is None or funcs.isnull().any():
+    if funcs is None or np.isnan(funcs).any():
         # we can't compute per-function exactly; instead compute Effort / (Volume) as proxy
-        eff_per_unit = efforts / df["vocabulary"].astype(float)  # fallback metric: effort per vocabulary token
+        eff_per_unit = efforts / data["vocabulary"]  # fallback metric: effort per vocabulary token
         ax.bar(labels, eff_per_unit)
         ax.set_ylabel("Effort per Vocabulary Token (E / vocabulary) [proxy]")
         ax.set_title("Effort per Function (fallback: Effort/Vocabulary shown)")
         # annotate original Effort values on top
         for i, val in enumerate(eff_per_unit):
-            ax.text(i, val + 0.02*max(eff_per_unit), f"{int(efforts.iloc[i]):,}", ha="center", va="bottom", fontsize=8, rotation=0)
+            ax.text(i, val + 0.02*max(eff_per_unit), f"{int(efforts[i]):,}", ha="center", va="bottom", fontsize=8, rotation=0)
     else:
         eff_per_func = efforts / funcs
         ax.bar(labels, eff_per_func)
@@ -187,24 +198,29 @@ def plot_effort_per_function(df, outpath):
 
 def main():
     ensure_out(OUT_DIR)
-    df = load_data(INPUT_DIR)
+    columns, rows = load_data(INPUT_DIR)
 
-    # Ensure numeric types
-    for col in ["vocabulary","volume","difficulty","effort","bugs"]:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
+    # Numeric columns as float arrays, ready for matplotlib
+    i = columns.index("project")
+    data = {"project": [str(row[i]) for row in rows]}
+    for col in ["vocabulary","volume","difficulty","effort","bugs","functions"]:
+        if col in columns:
+            data[col] = numeric_column(columns, rows, col)
 
     # Save a small CSV copy used for plotting (optional)
-    df.to_csv(os.path.join(OUT_DIR, "halstead_used_for_plots.csv"), index=False)
+    with open(os.path.join(OUT_DIR, "halstead_used_for_plots.csv"), "w", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(columns)
+        writer.writerows(rows)
 
     # Plot 1: Effort vs Difficulty
-    plot_effort_vs_difficulty(df, os.path.join(OUT_DIR, "effort_vs_difficulty.pdf"))
+    plot_effort_vs_difficulty(data, os.path.join(OUT_DIR, "effort_vs_difficulty.pdf"))
 
     # Plot 2: Difficulty vs Volume (quadrant)
-    plot_difficulty_vs_volume_quadrant(df, os.path.join(OUT_DIR, "difficulty_vs_volume_quadrant.pdf"))
+    plot_difficulty_vs_volume_quadrant(data, os.path.join(OUT_DIR, "difficulty_vs_volume_quadrant.pdf"))
 
     # Plot 3: Effort per Function (or fallback)
-    plot_effort_per_function(df, os.path.join(OUT_DIR, "effort_per_function.pdf"))
+    plot_effort_per_function(data, os.path.join(OUT_DIR, "effort_per_function.pdf"))
 
     print("Halstead plots saved to:", OUT_DIR)
 
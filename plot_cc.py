@@ -5,118 +5,147 @@ Expected input CSV columns: project,file,function,start_line,end_line,nloc,cyclo
 
 Creates: cc_cyclomatic_freq.png (bar chart)
 """
-import csv
 import argparse
+import heapq
+import functools
 from collections import Counter
-import statistics
 import os
+import numpy as np
+import pandas as pd
 
 try:
+    import matplotlib
+    matplotlib.use('Agg')  # only image files are written; skip GUI backend detection
     import matplotlib.pyplot as plt
 except Exception:
     plt = None
 
+MAX_BARS = 50  # beyond this many distinct values plot_frequency draws a histogram
 
-def read_cyclomatic(csv_path):
-    vals = []
+
+def _int_values(col):
+    """Numeric cells of col truncated to int; empty or non-numeric cells are dropped."""
+    col = pd.to_numeric(col, errors='coerce')
+    return col[np.isfinite(col)].astype(np.int64)
+
+
+def _is_candidate(name):
+    lname = name.lower()
+    return 'file' in lname or lname == 'path' or 'cyclomatic' in lname
+
+
+@functools.lru_cache(maxsize=8)
+def _read_df(csv_path, mtime_ns):
+    # mtime_ns is only part of the cache key: a rewritten CSV is parsed again
+    header = pd.read_csv(csv_path, nrows=0).columns
+    columns = [c for c in header if _is_candidate(c)]
+    # only candidate file/cyclomatic columns are parsed, by pandas' C reader. File
+    # columns stay strings, and keep_default_na=False makes an empty file name a
+    # group of its own rather than NaN
+    return pd.read_csv(csv_path, usecols=columns, engine='c', keep_default_na=False,
+                       dtype={c: str for c in columns if 'cyclomatic' not in c.lower()})
+
+
+def _load_df(csv_path):
+    """Parsed file/cyclomatic columns of csv_path, shared by read_cyclomatic and read_file_avg.
+
+    Callers must not modify the returned DataFrame.
+    """
     if not os.path.exists(csv_path):
         raise FileNotFoundError(csv_path)
-    with open(csv_path, newline='') as fh:
-        reader = csv.DictReader(fh)
-        if 'cyclomatic' not in reader.fieldnames:
-            # try lowercase/other names
-            alt = None
-            for name in reader.fieldnames:
-                if 'cyclomatic' in name.lower():
-                    alt = name
-                    break
-            if alt is None:
-                raise ValueError('No cyclomatic column found in CSV')
-            key = alt
-        else:
-            key = 'cyclomatic'
-
-        for row in reader:
-            v = row.get(key, '').strip()
-            try:
-                vals.append(int(float(v)))
-            except Exception:
-                # skip empty or non-numeric entries
-                continue
-    return vals
-
-
-def plot_frequency(values, out_path, title=None):
+    return _read_df(os.path.abspath(csv_path), os.stat(csv_path).st_mtime_ns)
+
+
+def read_cyclomatic(csv_path):
+    """Return a Counter mapping cyclomatic value -> number of functions."""
+    df = _load_df(csv_path)
+    columns = [c for c in df.columns if 'cyclomatic' in c.lower()]
+    if not columns:
+        raise ValueError('No cyclomatic column found in CSV')
+    # prefer an exact 'cyclomatic' column, else the first one mentioning it
+    key = 'cyclomatic' if 'cyclomatic' in columns else columns[0]
+    vc = _int_values(df[key]).value_counts()
+    return Counter(dict(zip(vc.index.tolist(), vc.tolist())))
+
+
+def plot_frequency(counter, out_path, title=None):
+    """Bar chart of a Counter as returned by read_cyclomatic."""
     if plt is None:
         raise RuntimeError('matplotlib not installed')
 
-    if not values:
+    if not counter:
         raise ValueError('No cyclomatic values to plot')
 
-    counter = Counter(values)
-    xs = sorted(counter.keys())
-    ys = [counter[x] for x in xs]
+    # keys and counts straight into arrays, then one argsort orders both
+    xs = np.fromiter(counter.keys(), dtype=np.int64, count=len(counter))
+    ys = np.fromiter(counter.values(), dtype=np.int64, count=len(counter))
+    order = np.argsort(xs)
+    xs, ys = xs[order], ys[order]
 
     plt.figure(figsize=(10, 6))
-    plt.bar(xs, ys, width=0.8, color='tab:blue', edgecolor='black')
+    many = len(xs) > MAX_BARS
+    if many:
+        # one bar and tick per distinct value gets unreadable and slow to draw;
+        # bin the counts instead (weights, so the values are never expanded)
+        plt.hist(xs, bins=MAX_BARS, weights=ys, color='tab:blue', edgecolor='black')
+    else:
+        plt.bar(xs, ys, width=0.8, color='tab:blue', edgecolor='black')
     plt.xlabel('Cyclomatic Complexity')
     plt.ylabel('Frequency (number of functions)')
     if title:
         plt.title(title)
     else:
         plt.title('Cyclomatic Complexity Frequency')
-    plt.xticks(xs)
+    if not many:
+        plt.xticks(xs)
     plt.grid(axis='y', linestyle='--', alpha=0.5)
     plt.tight_layout()
     plt.savefig(out_path)
     plt.close()
 
 
+def _weighted_median(counter):
+    """Median of the values a Counter represents, like statistics.median on its elements."""
+    total = sum(counter.values())
+    lo, hi = (total - 1) // 2, total // 2  # positions of the middle value(s)
+    low = None
+    seen = 0
+    for value in sorted(counter):
+        seen += counter[value]
+        if low is None and seen > lo:
+            low = value
+        if seen > hi:
+            return low if lo == hi else (low + value) / 2
+
+
 def read_file_avg(csv_path):
     """Return a dict mapping file -> (avg_cyclomatic, function_count)."""
-    if not os.path.exists(csv_path):
-        raise FileNotFoundError(csv_path)
-    sums = {}
-    counts = {}
-    with open(csv_path, newline='') as fh:
-        reader = csv.DictReader(fh)
-        # detect file and cyclomatic column names
-        file_key = None
-        cyclo_key = None
-        for name in reader.fieldnames:
-            lname = name.lower()
-            if file_key is None and lname in ('file', 'filename', 'path'):
+    df = _load_df(csv_path)
+    # detect file and cyclomatic column names
+    file_key = None
+    cyclo_key = None
+    for name in df.columns:
+        lname = name.lower()
+        if file_key is None and lname in ('file', 'filename', 'path'):
+            file_key = name
+        if cyclo_key is None and 'cyclomatic' in lname:
+            cyclo_key = name
+    if file_key is None:
+        # try common alternatives
+        for name in df.columns:
+            if 'file' in name.lower():
                 file_key = name
-            if cyclo_key is None and 'cyclomatic' in lname:
-                cyclo_key = name
-        if file_key is None:
-            # try common alternatives
-            for name in reader.fieldnames:
-                if 'file' in name.lower():
-                    file_key = name
-                    break
-        if cyclo_key is None:
-            for name in reader.fieldnames:
-                if 'cyclomatic' in name.lower():
-                    cyclo_key = name
-                    break
-        if file_key is None or cyclo_key is None:
-            raise ValueError('Could not detect file or cyclomatic columns')
-
-        for row in reader:
-            f = row.get(file_key, '').strip()
-            v = row.get(cyclo_key, '').strip()
-            try:
-                vnum = int(float(v))
-            except Exception:
-                continue
-            sums[f] = sums.get(f, 0) + vnum
-            counts[f] = counts.get(f, 0) + 1
-
-    result = {}
-    for f, s in sums.items():
-        result[f] = (s / counts[f], counts[f])
-    return result
+                break
+    if file_key is None or cyclo_key is None:
+        raise ValueError('Could not detect file or cyclomatic columns')
+
+    values = _int_values(df[cyclo_key])
+    files = df[file_key].str.strip()[values.index]
+    # integer file ids in order of first appearance; sums and counts are then two bincounts
+    codes, uniques = pd.factorize(files)
+    sums = np.bincount(codes, weights=values.to_numpy(), minlength=len(uniques))
+    counts = np.bincount(codes, minlength=len(uniques))
+    return dict(zip(uniques, zip((sums / counts).tolist(), counts.tolist())))
 
 
 def main():
@@ -128,14 +157,15 @@ def main():
     args = parser.parse_args()
 
     if args.mode == 'freq':
-        vals = read_cyclomatic(args.csv)
-        total = len(vals)
-        mean = statistics.mean(vals) if vals else 0
-        med = statistics.median(vals) if vals else 0
-        mx = max(vals) if vals else 0
+        counter = read_cyclomatic(args.csv)
+        # everything below comes straight from the counts; no per-function list or sort
+        total = sum(counter.values())
+        mean = sum(k * c for k, c in counter.items()) / total if total else 0
+        med = _weighted_median(counter) if total else 0
+        mx = max(counter) if total else 0
 
         title = f'Cyclomatic Complexity Frequency (functions={total}, mean={mean:.2f}, median={med}, max={mx})'
-        plot_frequency(vals, args.out, title=title)
+        plot_frequency(counter, args.out, title=title)
         print(f'Wrote {args.out} — functions: {total}, mean: {mean:.2f}, median: {med}, max: {mx}')
     else:
         # group by file and plot average cyclomatic per file
@@ -143,10 +173,8 @@ def main():
         if not file_map:
             print('No file-level data found in CSV')
             return
-        # sort by avg desc and take top N
-        items = sorted(file_map.items(), key=lambda x: x[1][0], reverse=True)
-        top_n = args.top
-        items = items[:top_n]
+        # top N by avg desc; a heap avoids sorting every file (ties keep file order, as sorted does)
+        items = heapq.nlargest(args.top, file_map.items(), key=lambda x: x[1][0])
 
         files = [os.path.basename(f) for f, _ in items]
         avgs = [v[0] for _, v in items]
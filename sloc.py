@@ -1,5 +1,83 @@
 import sys
 import os
+import csv
+import re
+import mmap
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+# Line comments run to the end of the line; block comments may span lines. String and
+# character literals are matched too, so whichever construct opens first wins and a
+# "/*" or "//" inside a literal is left alone. A literal may continue onto the next
+# line only through a backslash-newline; an unmatched quote is just an ordinary byte.
+_COMMENT_RE = re.compile(
+    rb'(?P<lit>"(?:\\(?:\r\n|.)|[^"\\\r\n])*"|\'(?:\\(?:\r\n|.)|[^\'\\\r\n])*\')'
+    rb'|//[^\r\n]*|/\*.*?\*/', re.S)
+_RE_NON_BREAK = re.compile(rb'[^\r\n]+')
+
+
+def _keep_line_breaks(m):
+    if m.lastgroup == 'lit':
+        return m.group()
+    return _RE_NON_BREAK.sub(b'', m.group())
+
+
+_CHUNK = 1 << 20
+
+# Cached counts are only valid for the counting rules that produced them: bump this
+# whenever _count_lines or _count_source_lines change what they count
+_CACHE_VERSION = 1
+
+
+def _count_lines(buf):
+    # Count line breaks in large windows with bytes.count (a C loop); no decoding
+    # is needed just to count lines. Like text-mode iteration, \n, \r and \r\n
+    # each end a line, and a last line without a line break still counts.
+    cnt = 0
+    last = b''
+    for start in range(0, len(buf), _CHUNK):
+        chunk = buf[start:start + _CHUNK]
+        cnt += chunk.count(b'\n') + chunk.count(b'\r') - chunk.count(b'\r\n')
+        if last == b'\r' and chunk[:1] == b'\n':
+            cnt -= 1  # \r\n split across two windows
+        last = chunk[-1:]
+    if last and last not in b'\r\n':
+        cnt += 1
+    return cnt
+
+
+def _count_source_lines(buf):
+    # Source Lines of Code (SLOC): lines with anything left once comments are removed.
+    # Every comment is dropped in one C-level scan (no decoding: the markers are ASCII);
+    # block comments keep their line breaks so the line structure is unchanged
+    code = _COMMENT_RE.sub(_keep_line_breaks, buf)
+    return sum(1 for line in code.splitlines() if line.strip())
+
+
+# module-level so it can be pickled into worker processes
+def _count_file(path):
+    """Return (LOC, SLOC) for one file, reading it only once."""
+    try:
+        with open(path, 'rb') as f:
+            try:
+                # a read-only mapping: both counts scan the page cache directly
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                # empty files cannot be mapped, nor can pipes and some special files
+                buf = f.read()
+            else:
+                # both counts scan front to back once: ask for aggressive readahead
+                if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    buf.madvise(mmap.MADV_SEQUENTIAL)
+    except (PermissionError, IsADirectoryError):
+        # skip unreadable files
+        return 0, 0
+    try:
+        return _count_lines(buf), _count_source_lines(buf)
+    finally:
+        if isinstance(buf, mmap.mmap):
+            buf.close()
+
 
 class project:
     def __init__(self, name, description, src, src_file_extensions):
@@ -7,100 +85,99 @@ class project:
         self.description = description
         self.src = src
         self.src_file_extensions = src_file_extensions
+        self._ext_tuple = tuple(src_file_extensions)
+        self._counts = None
 
     def get_LOC(self):
-        def count_file(path):
-            cnt = 0
-            try:
-                with open(path, 'r', encoding='utf-8') as f:
-                    for _ in f:
-                        cnt += 1
-            except (UnicodeDecodeError, PermissionError):
-                # fallback to latin-1 for files with different encoding, skip unreadable files
-                try:
-                    with open(path, 'r', encoding='latin-1') as f:
-                        for _ in f:
-                            cnt += 1
-                except Exception:
-                    return 0
-            except IsADirectoryError:
-                return 0
-            return cnt
-        
-        if not os.path.exists(self.src):
-            raise FileNotFoundError(self.src)
-
-        total = 0
-        if os.path.isfile(self.src):
-            return count_file(self.src)
-
-        for root, dirs, files in os.walk(self.src):
-            for name in files:
-                if not any(name.endswith(ext) for ext in self.src_file_extensions):
-                    continue
-                path = os.path.join(root, name)
-                total += count_file(path)
-
-        return total
+        return self.get_counts()[0]
 
     def get_SLOC(self):
-        # Source Lines of Code (SLOC) counting can be implemented here
-        def count_file(path):
-            cnt = 0
-            file_content = ""
+        return self.get_counts()[1]
+
+    def get_counts(self, cache=None):
+        """Return (LOC, SLOC) for the project, walking and reading each file once.
+
+        The result is kept on the instance, so get_LOC and get_SLOC share one pass.
+
+        cache: optional dict mapping path -> ((st_mtime_ns, st_size), (loc, sloc)).
+        Files whose stat key still matches are not read again; the dict is updated
+        in place.
+        """
+        if self._counts is None:
+            self._counts = self._sum_over_files(cache)
+        return self._counts
+
+    def _iter_files(self):
+        """Yield matching source files under self.src in os.walk (top-down) order."""
+        stack = [self.src]
+        while stack:
+            subdirs = []
             try:
-                with open(path, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        file_content += line
-            except (UnicodeDecodeError, PermissionError):
-                # fallback to latin-1 for files with different encoding, skip unreadable files
-                try:
-                    with open(path, 'r', encoding='latin-1') as f:
-                        for line in f:
-                            file_content += line
-                except Exception:
-                    return 0
-            except IsADirectoryError:
-                return 0
-            file_content.replace('\r\n', '\n').replace('\r', '\n')
-            lines = file_content.split('\n')
-            in_multiline_comment = False
-            for line in lines:
-                stripped_line = line.strip()
-                if in_multiline_comment:
-                    if '*/' in stripped_line:
-                        in_multiline_comment = False
-                        stripped_line = stripped_line.split('*/', 1)[1].strip()
-                    else:
-                        continue
-                if not stripped_line or stripped_line.startswith('//'):
-                    continue
-                if '/*' in stripped_line:
-                    in_multiline_comment = True
-                    stripped_line = stripped_line.split('/*', 1)[0].strip()
-                    if not stripped_line:
-                        continue
-                cnt += 1
-            return cnt
-
-
-
-        
+                it = os.scandir(stack.pop())
+            except OSError:
+                continue
+            with it:
+                for e in it:
+                    # DirEntry caches the file type from readdir, so no extra stat per entry
+                    if e.is_dir(follow_symlinks=False):
+                        subdirs.append(e.path)
+                    elif e.name.endswith(self._ext_tuple):
+                        yield e.path
+            stack.extend(reversed(subdirs))
+
+    def _sum_over_files(self, cache=None):
         if not os.path.exists(self.src):
             raise FileNotFoundError(self.src)
 
-        total = 0
         if os.path.isfile(self.src):
-            return count_file(self.src)
+            return _count_file(self.src)
+
+        if cache is None:
+            cache = {}
+        entries = []
+        for path in self._iter_files():
+            try:
+                st = os.stat(path)
+                key = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                key = None
+            entries.append((path, key))
+        misses = [path for path, key in entries if key is None or cache.get(path, (None,))[0] != key]
+
+        # files are independent, so count them in worker processes;
+        # a handful of files is not worth the pool start-up
+        if len(misses) <= 4:
+            fresh = dict(zip(misses, map(_count_file, misses)))
+        else:
+            with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+                fresh = dict(zip(misses, ex.map(_count_file, misses, chunksize=16)))
+
+        loc = sloc = 0
+        for path, key in entries:
+            if path in fresh:
+                counts = fresh[path]
+                if key is not None:
+                    cache[path] = (key, counts)
+            else:
+                counts = cache[path][1]
+            loc += counts[0]
+            sloc += counts[1]
+        return loc, sloc
+
+
+def _load_cache(path):
+    # a cache written under a different _CACHE_VERSION (or untagged) is dropped
+    try:
+        with open(path, 'rb') as f:
+            version, cache = pickle.load(f)
+    except Exception:
+        return {}
+    return cache if version == _CACHE_VERSION else {}
 
-        for root, dirs, files in os.walk(self.src):
-            for name in files:
-                if not any(name.endswith(ext) for ext in self.src_file_extensions):
-                    continue
-                path = os.path.join(root, name)
-                total += count_file(path)
 
-        return total
+def _save_cache(path, cache):
+    with open(path, 'wb') as f:
+        pickle.dump((_CACHE_VERSION, cache), f, protocol=pickle.HIGHEST_PROTOCOL)
 
 
 if __name__ == "__main__":
@@ -132,15 +209,22 @@ if __name__ == "__main__":
 
     output_dir = "output/sloc"
     os.makedirs(output_dir, exist_ok=True)
+    cache_path = os.path.join(output_dir, ".count_cache.pkl")
+    cache = _load_cache(cache_path)
 
     try:
-        with open(f"{output_dir}/loc.csv", "w") as f:
-            f.write("project,LOC,SLOC\n")
+        with open(f"{output_dir}/loc.csv", "w", newline="") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(["project", "LOC", "SLOC"])
+            rows = []
             for project in projects:
-                line_count = project.get_LOC()
-                sloc_count = project.get_SLOC()
-                f.write(f"{project.name},{line_count},{sloc_count}\n")
+                # one walk and one read per file gives both counts
+                line_count, sloc_count = project.get_counts(cache)
+                rows.append((project.name, line_count, sloc_count))
                 print(f"Processed project: {project.name}, LOC: {line_count}, SLOC: {sloc_count}")
+            writer.writerows(rows)
     except FileNotFoundError:
         print(f"File not found: {project.src}")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+    finally:
+        _save_cache(cache_path, cache)
\ No newline at end of file